@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2010 anchepiece
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in
+#   the documentation and/or other materials provided with the
+#   distribution.
+#
+# * Neither the name of the owner nor the names of its contributors may
+#   be used to endorse or promote products derived from this software
+#   without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+#
+# This script is written in Python and released to the open source
+# community for continuous improvements under the BSD 2.0 new
+# license, which can be found at:
+#
+#   http://www.opensource.org/licenses/bsd-license.php
+#
+
+
+#
+# An in-memory index over many start/end date spans.  Answers which spans
+# cover a day, which spans overlap a range and how many spans are active on
+# each day, without the gui.
+#
+
+import logging
+logger = logging.getLogger(__name__)
+from bisect import bisect_left, bisect_right
+from datetime import date
+
+from resources.main import calculate_diff
+
+class IntervalIndex(object):
+    """
+        Static interval index over (start_date, end_date) spans.
+
+        Spans are closed, so a span covers both its start and its end day.
+        A span whose end is before its start is indexed over the same days
+        as its swapped form, but keeps its original order for calculate_diff.
+        Queries return row numbers, ie: positions in the loaded columns, in
+        ascending order.
+
+        Point queries use a centered interval tree, range queries add a
+        slice of the start-sorted rows, both in O(log n + k).  Counts are
+        answered from two sorted endpoint arrays in O(log n).
+    """
+
+    def __init__(self, spans=None):
+        """
+            Initializes the index, bulk loading spans if given
+        """
+        if spans is None:
+            spans = []
+        self.load(spans)
+    #end def __init__
+
+    def from_columns(cls, start_dates, end_dates):
+        """
+            Builds an index from parallel start and end date columns
+        """
+        if len(start_dates) != len(end_dates):
+            raise ValueError('start and end columns differ in length '
+                '(%d != %d)' % (len(start_dates), len(end_dates)))
+        return cls(zip(start_dates, end_dates))
+    from_columns = classmethod(from_columns)
+    #end def from_columns
+
+    def load(self, spans):
+        """
+            Replaces the contents of the index with spans and rebuilds it
+        """
+        self.start_dates = []
+        self.end_dates = []
+        self.lows = []
+        self.highs = []
+        for (start_date, end_date) in spans:
+            low = start_date.toordinal()
+            high = end_date.toordinal()
+            if high < low:
+                (low, high) = (high, low)
+            self.start_dates.append(start_date)
+            self.end_dates.append(end_date)
+            self.lows.append(low)
+            self.highs.append(high)
+
+        rows = range(len(self.lows))
+        self._by_low = sorted(rows, key=self.lows.__getitem__)
+        self._sorted_lows = [self.lows[i] for i in self._by_low]
+        self._sorted_highs = sorted(self.highs)
+        self._root = self._build(rows)
+        logger.debug('Indexed %d spans', len(self.lows))
+    #end def load
+
+    def _build(self, rows):
+        """
+            Builds a centered interval tree node as a list of
+            [center, left, right, rows by low, rows by high descending]
+        """
+        if not rows:
+            return None
+        lows = self.lows
+        highs = self.highs
+        endpoints = sorted([lows[i] for i in rows] + [highs[i] for i in rows])
+        center = endpoints[len(endpoints) // 2]
+
+        left = []
+        right = []
+        here = []
+        for i in rows:
+            if highs[i] < center:
+                left.append(i)
+            elif lows[i] > center:
+                right.append(i)
+            else:
+                here.append(i)
+
+        by_low = sorted(here, key=lows.__getitem__)
+        by_high = sorted(here, key=highs.__getitem__, reverse=True)
+        return [center, self._build(left), self._build(right),
+            by_low, by_high]
+    #end def _build
+
+    def __len__(self):
+        return len(self.lows)
+    #end def __len__
+
+    def _stab(self, day, found):
+        """
+            Appends the rows covering the ordinal day to found
+        """
+        lows = self.lows
+        highs = self.highs
+        node = self._root
+        while node is not None:
+            (center, left, right, by_low, by_high) = node
+            if day < center:
+                for i in by_low:
+                    if lows[i] > day:
+                        break
+                    found.append(i)
+                node = left
+            elif day > center:
+                for i in by_high:
+                    if highs[i] < day:
+                        break
+                    found.append(i)
+                node = right
+            else:
+                found.extend(by_low)
+                break
+        return found
+    #end def _stab
+
+    def covering(self, day):
+        """
+            Returns the rows of all spans that cover day
+        """
+        found = self._stab(day.toordinal(), [])
+        found.sort()
+        return found
+    #end def covering
+
+    def overlapping(self, start_date, end_date):
+        """
+            Returns the rows of all spans sharing at least one day with the
+            closed range start_date to end_date
+        """
+        low = start_date.toordinal()
+        high = end_date.toordinal()
+        if high < low:
+            (low, high) = (high, low)
+        # spans covering the first day, plus spans starting inside the range
+        found = self._stab(low, [])
+        first = bisect_right(self._sorted_lows, low)
+        last = bisect_right(self._sorted_lows, high)
+        found.extend(self._by_low[first:last])
+        found.sort()
+        return found
+    #end def overlapping
+
+    def count_active(self, day):
+        """
+            Returns the number of spans that cover day
+        """
+        day = day.toordinal()
+        return bisect_right(self._sorted_lows, day) - \
+            bisect_left(self._sorted_highs, day)
+    #end def count_active
+
+    def active_counts(self, start_date=None, end_date=None):
+        """
+            Sweeps the index and yields a (date, active count) pair for every
+            day from start_date to end_date, defaulting to the first and last
+            indexed days
+        """
+        if not self.lows and (start_date is None or end_date is None):
+            # nothing indexed to default the missing bound from
+            return
+        sorted_lows = self._sorted_lows
+        sorted_highs = self._sorted_highs
+        if start_date is None:
+            first = sorted_lows[0]
+        else:
+            first = start_date.toordinal()
+        if end_date is None:
+            last = sorted_highs[-1]
+        else:
+            last = end_date.toordinal()
+
+        # spans start on their low day and stop counting the day after high
+        started = bisect_right(sorted_lows, first - 1)
+        ended = bisect_left(sorted_highs, first)
+        n = len(sorted_lows)
+        day = first
+        while day <= last:
+            while started < n and sorted_lows[started] <= day:
+                started += 1
+            while ended < n and sorted_highs[ended] < day:
+                ended += 1
+            yield (date.fromordinal(day), started - ended)
+            day += 1
+    #end def active_counts
+
+    def span(self, row):
+        """
+            Returns the (start_date, end_date) span stored at row
+        """
+        return (self.start_dates[row], self.end_dates[row])
+    #end def span
+
+    def diff(self, row):
+        """
+            Returns the (days, months, years) difference of the span at row,
+            as calculated by DateCalculator
+        """
+        return calculate_diff(self.start_dates[row], self.end_dates[row])
+    #end def diff
+
+    def diffs(self, rows):
+        """
+            Returns (row, (days, months, years)) pairs for rows, ie: the
+            result of covering() or overlapping()
+        """
+        return [(row, self.diff(row)) for row in rows]
+    #end def diffs
+
+
+# vim:set shiftwidth=4 softtabstop=4 expandtab textwidth=79:
@@ -74,6 +74,43 @@ if __name__ == '__main__':
     print __usage__
     exit()
 
+def calculate_diff(start_date, end_date):
+    """
+        Calculates the difference between start and end dates and returns
+        a (days, months, years) tuple of whole units.  Shared by the gui and
+        by resources.interval so both report spans the same way.
+    """
+    diff_timedelta = end_date - start_date
+
+    diff_years = end_date.year - start_date.year
+    diff_months = end_date.month - start_date.month
+    diff_days = end_date.day - start_date.day
+
+    whole_years = 0
+    whole_months = diff_months + diff_years * 12
+    if end_date < start_date:
+        # we have a negative timedelta
+        if diff_days < 0:
+            whole_months += 1
+        if whole_months < 0:
+            if diff_days > 0:
+                whole_months += 1
+            whole_years = math.floor((whole_months-1)/12) + 1
+        else:
+            if diff_days < 0:
+                whole_months -= 1
+            whole_years = math.floor((whole_months)/12)
+    else:
+        # we have a positive timedelta
+        if diff_days < 0:
+            whole_months -= 1
+        whole_years = math.floor((whole_months)/12)
+
+    whole_years = int(whole_years)
+    whole_days  = int(diff_timedelta.days)
+    return (whole_days, whole_months, whole_years)
+#end def calculate_diff
+
 class DateCalculator(object):
 
     _application = None
@@ -406,34 +443,8 @@ class DateCalculator(object):
             This method calulates the difference between start and end dates
         """
         logger.info('Dates  -> [%s] <-> [%s]' % (start_date, end_date))
-        diff_timedelta = end_date - start_date
-
-        diff_years = end_date.year - start_date.year
-        diff_months = end_date.month - start_date.month
-        diff_days = end_date.day - start_date.day
-
-        whole_years = 0
-        whole_months = diff_months + diff_years * 12
-        if end_date < start_date:
-            # we have a negative timedelta
-            if diff_days < 0:
-                whole_months += 1
-            if whole_months < 0:
-                if diff_days > 0:
-                    whole_months += 1
-                whole_years = math.floor((whole_months-1)/12) + 1
-            else:
-                if diff_days < 0:
-                    whole_months -= 1
-                whole_years = math.floor((whole_months)/12)
-        else:
-            # we have a positive timedelta
-            if diff_days < 0:
-                whole_months -= 1
-            whole_years = math.floor((whole_months)/12)
-
-        whole_years = int(whole_years)
-        whole_days  = int(diff_timedelta.days)
+        (whole_days, whole_months, whole_years) = \
+            calculate_diff(start_date, end_date)
         logger.info('Difference -> days:%s months:%s years:%s',
             whole_days, whole_months, whole_years)
         return (whole_days, whole_months, whole_years)
@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2010 anchepiece
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in
+#   the documentation and/or other materials provided with the
+#   distribution.
+#
+# * Neither the name of the owner nor the names of its contributors may
+#   be used to endorse or promote products derived from this software
+#   without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+#
+# This script is written in Python and released to the open source
+# community for continuous improvements under the BSD 2.0 new
+# license, which can be found at:
+#
+#   http://www.opensource.org/licenses/bsd-license.php
+#
+
+
+#
+# Unit tests for resources.interval, checked against a brute-force scan over
+# random spans.  Run from the top level directory with:
+#
+#   python -m unittest discover tests
+#
+
+import random
+import unittest
+from datetime import date, timedelta
+
+from resources.interval import IntervalIndex
+from resources.main import calculate_diff
+
+BASE = date(2000, 1, 1)
+
+def random_spans(rnd, count):
+    """
+        Returns count random spans, including reversed and single day spans
+    """
+    spans = []
+    for i in range(count):
+        start_date = BASE + timedelta(rnd.randint(0, 1000))
+        kind = rnd.randint(0, 3)
+        if kind == 0:
+            end_date = start_date
+        elif kind == 1:
+            end_date = start_date - timedelta(rnd.randint(1, 60))
+        else:
+            end_date = start_date + timedelta(rnd.randint(1, 120))
+        spans.append((start_date, end_date))
+    return spans
+#end def random_spans
+
+class IntervalIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.rnd = random.Random(2010)
+        self.spans = random_spans(self.rnd, 500)
+        self.index = IntervalIndex(self.spans)
+    #end def setUp
+
+    def brute_overlapping(self, start_date, end_date):
+        if end_date < start_date:
+            (start_date, end_date) = (end_date, start_date)
+        rows = []
+        for (row, span) in enumerate(self.spans):
+            if min(span) <= end_date and max(span) >= start_date:
+                rows.append(row)
+        return rows
+    #end def brute_overlapping
+
+    def random_day(self):
+        # reaches past both ends of the indexed spans
+        return BASE + timedelta(self.rnd.randint(-100, 1300))
+    #end def random_day
+
+    def test_covering(self):
+        for i in range(200):
+            day = self.random_day()
+            expected = self.brute_overlapping(day, day)
+            self.assertEqual(self.index.covering(day), expected)
+    #end def test_covering
+
+    def test_covering_outside_spans(self):
+        self.assertEqual(self.index.covering(BASE - timedelta(365)), [])
+        self.assertEqual(self.index.covering(BASE + timedelta(5000)), [])
+    #end def test_covering_outside_spans
+
+    def test_overlapping(self):
+        for i in range(200):
+            start_date = self.random_day()
+            end_date = start_date + timedelta(self.rnd.randint(0, 90))
+            expected = self.brute_overlapping(start_date, end_date)
+            self.assertEqual(
+                self.index.overlapping(start_date, end_date), expected)
+            self.assertEqual(
+                self.index.overlapping(end_date, start_date), expected)
+    #end def test_overlapping
+
+    def test_count_active(self):
+        for i in range(200):
+            day = self.random_day()
+            expected = len(self.brute_overlapping(day, day))
+            self.assertEqual(self.index.count_active(day), expected)
+    #end def test_count_active
+
+    def test_active_counts(self):
+        counts = list(self.index.active_counts())
+        first = min([min(span) for span in self.spans])
+        last = max([max(span) for span in self.spans])
+        self.assertEqual(counts[0][0], first)
+        self.assertEqual(counts[-1][0], last)
+        self.assertEqual(len(counts), (last - first).days + 1)
+        for (day, count) in counts:
+            self.assertEqual(count, len(self.brute_overlapping(day, day)))
+    #end def test_active_counts
+
+    def test_active_counts_range(self):
+        start_date = BASE - timedelta(30)
+        end_date = BASE + timedelta(30)
+        counts = list(self.index.active_counts(start_date, end_date))
+        self.assertEqual(len(counts), 61)
+        for (day, count) in counts:
+            self.assertEqual(count, len(self.brute_overlapping(day, day)))
+    #end def test_active_counts_range
+
+    def test_empty_index(self):
+        index = IntervalIndex()
+        self.assertEqual(len(index), 0)
+        self.assertEqual(index.covering(BASE), [])
+        self.assertEqual(index.overlapping(BASE, BASE + timedelta(10)), [])
+        self.assertEqual(index.count_active(BASE), 0)
+        self.assertEqual(list(index.active_counts()), [])
+        self.assertEqual(list(index.active_counts(BASE)), [])
+        counts = list(index.active_counts(BASE, BASE + timedelta(44)))
+        self.assertEqual(len(counts), 45)
+        self.assertEqual(counts[0], (BASE, 0))
+        self.assertEqual(counts[-1], (BASE + timedelta(44), 0))
+    #end def test_empty_index
+
+    def test_from_columns(self):
+        start_dates = [span[0] for span in self.spans]
+        end_dates = [span[1] for span in self.spans]
+        index = IntervalIndex.from_columns(start_dates, end_dates)
+        self.assertEqual(len(index), len(self.spans))
+        self.assertEqual(index.span(7), self.spans[7])
+        self.assertRaises(ValueError, IntervalIndex.from_columns,
+            start_dates, end_dates[:-1])
+    #end def test_from_columns
+
+    def test_diff(self):
+        spans = [(date(2010, 3, 15), date(2009, 1, 20)),
+            (date(2010, 3, 15), date(2010, 3, 15)),
+            (date(2008, 2, 29), date(2010, 2, 28))]
+        index = IntervalIndex(spans)
+        for (row, (start_date, end_date)) in enumerate(spans):
+            self.assertEqual(index.diff(row),
+                calculate_diff(start_date, end_date))
+        self.assertNotEqual(index.diff(0),
+            calculate_diff(spans[0][1], spans[0][0]))
+        self.assertEqual(index.diffs([2, 0]),
+            [(2, index.diff(2)), (0, index.diff(0))])
+    #end def test_diff
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim:set shiftwidth=4 softtabstop=4 expandtab textwidth=79: